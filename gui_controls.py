@@ -1,10 +1,7 @@
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
-from PIL import Image, ImageTk
-import cv2
-import numpy as np
+from tkinter import messagebox, ttk
 from image_processor import ImageProcessor
-import os
+from concurrent.futures import ThreadPoolExecutor
 
 
 class ControlPanel:
@@ -15,18 +12,35 @@ class ControlPanel:
         self.processor = image_processor
         self.callback = callback
         self.frame = ttk.Frame(parent, style='Dark.TFrame')
+        self._pending = {}
+        self._pending_transforms = []
+        self._transform_future = None
+        self._dragging = False
+        self._drag_start = None
+        # A single worker keeps edits ordered while the Tk loop stays responsive
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._futures = {}
+        self._generation = {}
         self.create_controls()
 
     def create_controls(self):
         """Create all control buttons and sliders."""
+        # Live preview toggle: when off, sliders only apply on mouse release
+        preview_frame = ttk.LabelFrame(self.frame, text="Preview", padding=10)
+        preview_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        self.live_preview_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(preview_frame, text="Live preview", variable=self.live_preview_var).pack(anchor=tk.W)
+
         # Blur intensity slider
         blur_frame = ttk.LabelFrame(self.frame, text="Blur Intensity", padding=10)
         blur_frame.pack(fill=tk.X, padx=5, pady=5)
         
         self.blur_var = tk.IntVar(value=5)
         blur_slider = ttk.Scale(blur_frame, from_=1, to=31, orient=tk.HORIZONTAL,
-                               variable=self.blur_var, command=lambda x: self.apply_blur())
+                               variable=self.blur_var, command=lambda x: self.on_blur_change())
         blur_slider.pack(fill=tk.X)
+        self._bind_drag(blur_slider, 'blur', self.apply_blur)
         self.blur_label = ttk.Label(blur_frame, text="Intensity: 5", style='TLabel')
         self.blur_label.pack()
 
@@ -36,8 +50,9 @@ class ControlPanel:
         
         self.brightness_var = tk.DoubleVar(value=1.0)
         brightness_slider = ttk.Scale(brightness_frame, from_=0.5, to=2.0, orient=tk.HORIZONTAL,
-                                     variable=self.brightness_var, command=lambda x: self.apply_brightness())
+                                     variable=self.brightness_var, command=lambda x: self.on_brightness_change())
         brightness_slider.pack(fill=tk.X)
+        self._bind_drag(brightness_slider, 'brightness', self.apply_brightness)
         self.brightness_label = ttk.Label(brightness_frame, text="Factor: 1.0", style='TLabel')
         self.brightness_label.pack()
 
@@ -47,8 +62,9 @@ class ControlPanel:
         
         self.contrast_var = tk.DoubleVar(value=1.0)
         contrast_slider = ttk.Scale(contrast_frame, from_=0.5, to=2.0, orient=tk.HORIZONTAL,
-                                   variable=self.contrast_var, command=lambda x: self.apply_contrast())
+                                   variable=self.contrast_var, command=lambda x: self.on_contrast_change())
         contrast_slider.pack(fill=tk.X)
+        self._bind_drag(contrast_slider, 'contrast', self.apply_contrast)
         self.contrast_label = ttk.Label(contrast_frame, text="Factor: 1.0", style='TLabel')
         self.contrast_label.pack()
 
@@ -81,86 +97,254 @@ class ControlPanel:
         
         ttk.Button(reset_frame, text="Reset to Original", command=self.reset_image, style='Alt.TButton').pack(fill=tk.X, pady=2)
 
-    def apply_grayscale(self):
-        """Apply grayscale filter."""
+    def _debounce(self, key, fn, delay=150):
+        """Schedule fn after delay ms, cancelling any pending call for key."""
+        if key in self._pending:
+            self.frame.after_cancel(self._pending[key])
+        self._pending[key] = self.frame.after(delay, lambda: self._run_pending(key, fn))
+
+    def _run_pending(self, key, fn):
+        """Run a debounced call and forget its scheduled id."""
+        self._pending.pop(key, None)
+        fn()
+
+    def _bind_drag(self, slider, key, fn):
+        """Track drag state on a slider and run fn at full resolution on release."""
+        slider.bind('<ButtonPress-1>', lambda e: self._start_drag(slider))
+        slider.bind('<ButtonRelease-1>', lambda e: self._end_drag(slider, key, fn))
+
+    def _start_drag(self, slider):
+        """Enter drag mode so slider updates use the fast preview path."""
+        self._dragging = True
+        self._drag_start = slider.get()
+
+    def _end_drag(self, slider, key, fn):
+        """Leave drag mode and apply the final slider value once, if it changed."""
+        self._dragging = False
+        if key in self._pending:
+            self.frame.after_cancel(self._pending.pop(key))
+        if slider.get() != self._drag_start:
+            fn()
+            return
+        # A click, or a drag back to its start: nothing to commit, so drop any
+        # preview still in flight and redraw the committed image over a shown
+        # one. Only previews are keyed; an earlier release's commit still runs
+        self._drop_preview(key)
+        self.callback()
+
+    def on_blur_change(self):
+        """Update blur label and, with live preview on, schedule the blur."""
+        self.blur_label.config(text=f"Intensity: {int(self.blur_var.get())}")
+        if self.live_preview_var.get():
+            self._debounce('blur', self.apply_blur)
+
+    def on_brightness_change(self):
+        """Update brightness label and, with live preview on, schedule the adjustment."""
+        self.brightness_label.config(text=f"Factor: {float(self.brightness_var.get()):.2f}")
+        if self.live_preview_var.get():
+            self._debounce('brightness', self.apply_brightness)
+
+    def on_contrast_change(self):
+        """Update contrast label and, with live preview on, schedule the adjustment."""
+        self.contrast_label.config(text=f"Factor: {float(self.contrast_var.get()):.2f}")
+        if self.live_preview_var.get():
+            self._debounce('contrast', self.apply_contrast)
+
+    def submit(self, func, args, failure, error, on_success=None, on_failure=None):
+        """Run a one-shot processor call on the shared edit worker.
+
+        Every change to the processor goes through this one worker, so calls
+        from outside the panel (undo, redo, loading, saving) stay in order
+        with the panel's own edits; queued rotate/flip steps are submitted
+        first, so e.g. a save right after a rotate includes the rotation.
+        """
+        self._submit(None, func, args, failure, error, on_success, on_failure)
+
+    def _submit(self, key, func, args, failure, error, on_success=None, on_failure=None):
+        """Run a processor call on the worker thread and poll for its result.
+
+        Slider jobs pass a key; each key has a generation counter, so a newer
+        submission cancels the older future, the worker skips it if it already
+        dequeued it, and any late result from it is discarded. One-shot jobs
+        pass key=None and are always delivered. on_failure, if given, replaces
+        the failure message box for a None or False result.
+        """
+        # Keep edit order: queued transforms run before any later job
+        if self._pending_transforms:
+            self._flush_transforms()
+        generation = None
+        if key is not None:
+            previous = self._futures.get(key)
+            if previous is not None:
+                previous.cancel()
+            generation = self._generation.get(key, 0) + 1
+            self._generation[key] = generation
+            future = self._executor.submit(self._run_latest, key, generation, func, args)
+            self._futures[key] = future
+        else:
+            future = self._executor.submit(func, *args)
+        self.frame.after(20, lambda: self._poll(key, generation, future, failure, error,
+                                                on_success, on_failure))
+        return future
+
+    def _run_latest(self, key, generation, func, args):
+        """Worker job: skip func if a newer job for key was submitted meanwhile.
+
+        cancel() only stops futures that have not started; this check also
+        drops a job the worker picked up just before it was superseded.
+        """
+        if generation != self._generation.get(key):
+            return None
+        return func(*args)
+
+    def _poll(self, key, generation, future, failure, error, on_success, on_failure=None):
+        """Deliver a finished worker result on the Tk thread."""
+        if not future.done():
+            self.frame.after(20, lambda: self._poll(key, generation, future, failure, error,
+                                                    on_success, on_failure))
+            return
+        if future.cancelled():
+            return
+        if key is not None:
+            if generation != self._generation.get(key):
+                return
+            self._futures.pop(key, None)
         try:
-            if self.processor.convert_grayscale():
-                self.callback()
-            else:
-                messagebox.showerror("Error", "Failed to apply grayscale filter")
+            result = future.result()
         except Exception as e:
-            messagebox.showerror("Error", f"Error applying grayscale: {str(e)}")
+            messagebox.showerror("Error", f"{error}: {str(e)}")
+            return
+        if result is None or result is False:
+            if on_failure is not None:
+                on_failure()
+            else:
+                messagebox.showerror("Error", failure)
+        elif on_success is not None:
+            on_success(result)
+        else:
+            self.callback()
+
+    def apply_grayscale(self):
+        """Apply grayscale filter."""
+        self._submit(None, self.processor.convert_grayscale, (),
+                     "Failed to apply grayscale filter", "Error applying grayscale")
 
     def apply_edges(self):
         """Apply edge detection."""
-        try:
-            if self.processor.detect_edges():
-                self.callback()
-            else:
-                messagebox.showerror("Error", "Failed to apply edge detection")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error applying edge detection: {str(e)}")
+        self._submit(None, self.processor.detect_edges, (),
+                     "Failed to apply edge detection", "Error applying edge detection")
+
+    def _apply_and_commit(self, op, *args):
+        """Worker job: run a slider op at full resolution and commit it."""
+        return op(*args) and self.processor.commit()
+
+    def _drop_preview(self, key):
+        """Cancel the preview job for key and discard any late result from it."""
+        if key in self._futures:
+            self._futures.pop(key).cancel()
+        self._generation[key] = self._generation.get(key, 0) + 1
+
+    def _commit_slider(self, key, op, value, failure, error):
+        """Apply and commit a slider value; previews for key no longer matter.
+
+        The commit is submitted with key=None, so a later preview for the
+        same slider can never cancel or skip an edit the user released.
+        """
+        self._drop_preview(key)
+        self._submit(None, self._apply_and_commit, (op, value), failure, error)
 
     def apply_blur(self):
         """Apply blur with current slider value."""
         try:
             intensity = int(self.blur_var.get())
-            self.blur_label.config(text=f"Intensity: {intensity}")
-            if self.processor.apply_blur(intensity):
-                self.callback()
+            if self._dragging:
+                self._submit('blur', self.processor.apply_blur_preview, (intensity,),
+                             "Failed to apply blur", "Error applying blur",
+                             on_success=lambda preview: self.callback(preview, interactive=True))
             else:
-                messagebox.showerror("Error", "Failed to apply blur")
+                self._commit_slider('blur', self.processor.apply_blur, intensity,
+                                    "Failed to apply blur", "Error applying blur")
         except Exception as e:
             messagebox.showerror("Error", f"Error applying blur: {str(e)}")
 
     def apply_brightness(self):
-        """Apply brightness adjustment."""
+        """Apply brightness adjustment, committing it unless a drag is in progress."""
         try:
             factor = float(self.brightness_var.get())
-            self.brightness_label.config(text=f"Factor: {factor:.2f}")
-            if self.processor.adjust_brightness(factor):
-                self.callback()
+            if self._dragging:
+                self._submit('brightness', self.processor.adjust_brightness_preview, (factor,),
+                             "Failed to apply brightness adjustment", "Error adjusting brightness",
+                             on_success=lambda preview: self.callback(preview, interactive=True))
             else:
-                messagebox.showerror("Error", "Failed to apply brightness adjustment")
+                self._commit_slider('brightness', self.processor.adjust_brightness, factor,
+                                    "Failed to apply brightness adjustment", "Error adjusting brightness")
         except Exception as e:
             messagebox.showerror("Error", f"Error adjusting brightness: {str(e)}")
 
     def apply_contrast(self):
-        """Apply contrast adjustment."""
+        """Apply contrast adjustment, committing it unless a drag is in progress."""
         try:
             factor = float(self.contrast_var.get())
-            self.contrast_label.config(text=f"Factor: {factor:.2f}")
-            if self.processor.adjust_contrast(factor):
-                self.callback()
+            if self._dragging:
+                self._submit('contrast', self.processor.adjust_contrast_preview, (factor,),
+                             "Failed to apply contrast adjustment", "Error adjusting contrast",
+                             on_success=lambda preview: self.callback(preview, interactive=True))
             else:
-                messagebox.showerror("Error", "Failed to apply contrast adjustment")
+                self._commit_slider('contrast', self.processor.adjust_contrast, factor,
+                                    "Failed to apply contrast adjustment", "Error adjusting contrast")
         except Exception as e:
             messagebox.showerror("Error", f"Error adjusting contrast: {str(e)}")
 
     def rotate(self, angle):
-        """Rotate image."""
-        try:
-            if self.processor.rotate_image(angle):
-                self.callback()
-            else:
-                messagebox.showerror("Error", f"Failed to rotate image by {angle} degrees")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error rotating image: {str(e)}")
+        """Queue a rotation; transforms clicked in quick succession apply in one pass."""
+        self._queue_transform(('rotate', angle))
 
     def flip(self, direction):
-        """Flip image."""
-        try:
-            if self.processor.flip_image(direction):
-                self.callback()
-            else:
-                messagebox.showerror("Error", f"Failed to flip image {direction}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error flipping image: {str(e)}")
+        """Queue a flip; transforms clicked in quick succession apply in one pass."""
+        self._queue_transform(('flip', direction))
+
+    def _queue_transform(self, step):
+        """Add a rotate/flip step and apply it now, or after a running transform.
+
+        Steps clicked while a transform is still running are merged into the
+        next one, so clicks are never delayed but bursts still apply once.
+        """
+        self._pending_transforms.append(step)
+        if 'transform' not in self._pending:
+            self._flush_when_idle()
+
+    def _flush_when_idle(self):
+        """Flush queued steps once no transform job is running, polling until then."""
+        if not self._pending_transforms:
+            return
+        if self._transform_future is None or self._transform_future.done():
+            self._flush_transforms()
+        else:
+            self._debounce('transform', self._flush_when_idle, delay=20)
+
+    def discard_transforms(self):
+        """Drop queued rotate/flip steps, e.g. when another image is loaded."""
+        if 'transform' in self._pending:
+            self.frame.after_cancel(self._pending.pop('transform'))
+        self._pending_transforms = []
+
+    def _flush_transforms(self, out_size=None, on_success=None):
+        """Apply all queued steps, plus an optional resize, as a single transform job."""
+        if 'transform' in self._pending:
+            self.frame.after_cancel(self._pending.pop('transform'))
+        steps, self._pending_transforms = tuple(self._pending_transforms), []
+        if not steps and out_size is None:
+            return
+        failure = "Failed to resize image" if out_size else "Failed to transform image"
+        error = "Error resizing image" if out_size else "Error transforming image"
+        self._transform_future = self._submit(None, self.processor.compose_transform, (steps, out_size),
+                                              failure, error, on_success=on_success)
 
     def resize_dialog(self):
         """Open dialog for image resizing."""
         try:
-            current_w, current_h = self.processor.get_image_dimensions()
+            # Account for rotations still waiting in the transform queue
+            current_w, current_h = self.processor.transform_size(self._pending_transforms)
             
             dialog = tk.Toplevel()
             dialog.title("Resize Image")
@@ -177,17 +361,18 @@ class ControlPanel:
             height_var = tk.StringVar(value=str(current_h))
             ttk.Entry(dialog, textvariable=height_var, width=10).pack(side=tk.LEFT, padx=5)
             
+            def resized(result):
+                self.callback()
+                dialog.destroy()
+                messagebox.showinfo("Success", "Image resized successfully")
+
             def apply_resize():
                 try:
                     width = int(width_var.get())
                     height = int(height_var.get())
                     if width > 0 and height > 0:
-                        if self.processor.resize_image(width, height):
-                            self.callback()
-                            dialog.destroy()
-                            messagebox.showinfo("Success", "Image resized successfully")
-                        else:
-                            messagebox.showerror("Error", "Failed to resize image")
+                        # Fold any queued rotate/flip steps into the same warp
+                        self._flush_transforms((width, height), on_success=resized)
                     else:
                         messagebox.showerror("Invalid Input", "Width and height must be positive")
                 except ValueError:
@@ -201,14 +386,12 @@ class ControlPanel:
 
     def reset_image(self):
         """Reset image to original."""
-        try:
-            if self.processor.reset_image():
-                self.callback()
-                messagebox.showinfo("Success", "Image reset to original")
-            else:
-                messagebox.showerror("Error", "Failed to reset image")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error resetting image: {str(e)}")
+        def reset(result):
+            self.callback()
+            messagebox.showinfo("Success", "Image reset to original")
+
+        self._submit(None, self.processor.reset_image, (),
+                     "Failed to reset image", "Error resetting image", on_success=reset)
 
 
 class StatusBar:
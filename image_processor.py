@@ -1,75 +1,368 @@
 import cv2
 import numpy as np
 from typing import Optional, Tuple
-import copy
+from functools import lru_cache
+from collections import OrderedDict
+import time
 
 
 class ImageProcessor:
-    """Image processing operations using OpenCV."""
+    """Image processing operations using OpenCV.
 
-    def __init__(self, image_path: Optional[str] = None):
-        """Initialize processor with optional image path."""
-        self.original_image = None
+    Slider-driven ops (blur, brightness, contrast) are always recomputed from
+    the last committed image and only enter history on commit(); every other
+    op commits immediately. Images are HxWx3 RGB, or HxW once converted to
+    grayscale, so gray images are not expanded back to three channels.
+    Image arrays are replaced, never modified in place, so the current
+    image, committed image, history states and cached results share buffers
+    instead of copying them.
+    """
+
+    # Slider-driven ops whose rapid repeats share a single history entry
+    COALESCE_OPS = ('blur', 'brightness', 'contrast')
+    COALESCE_WINDOW = 0.5
+    # Recent filter results kept for instant recall (e.g. dragging back and forth)
+    RESULT_CACHE_SIZE = 8
+    # History states kept as raw arrays; older ones are stored PNG-encoded
+    HISTORY_RAW_STATES = 8
+    # Ops recorded as replayable records instead of pixel snapshots
+    REPLAY_OPS = ('grayscale', 'rotate', 'flip', 'resize', 'transform')
+    # Longest run of records before a snapshot is forced, bounding replay cost
+    MAX_REPLAY_OPS = 8
+
+    ROTATIONS = {
+        90: cv2.ROTATE_90_COUNTERCLOCKWISE,
+        180: cv2.ROTATE_180,
+        270: cv2.ROTATE_90_CLOCKWISE,
+    }
+    FLIP_CODES = {'horizontal': 1, 'vertical': 0}
+    # Blur kernel size from which stackBlur replaces the true Gaussian
+    STACK_BLUR_MIN_KSIZE = 15
+    # Longest side of the working copy that drag previews are computed on
+    PREVIEW_MAX_SIDE = 1600
+
+    def __init__(self, image_path: Optional[str] = None, use_gpu: Optional[bool] = None):
+        """Initialize processor with optional image path.
+
+        use_gpu routes the heavy filters through OpenCV's OpenCL T-API; by
+        default it is enabled whenever an OpenCL device is available.
+        """
+        if use_gpu is None:
+            use_gpu = cv2.ocl.haveOpenCL()
+        self.use_gpu = bool(use_gpu)
+        cv2.ocl.setUseOpenCL(self.use_gpu)
+        # Make sure OpenCV's SSE/AVX code paths are enabled
+        cv2.setUseOptimized(True)
+        self._original_image = None
+        self._encoded_bytes = None
         self.current_image = None
         self.image_path = image_path
         self.history = []
         self.history_index = -1
+        self._committed_image = None
+        self._pending_op = None
+        self._last_edit_t = 0.0
+        self._result_cache = OrderedDict()
 
         if image_path:
             self.load_image(image_path)
 
+    @property
+    def current_image(self) -> Optional[np.ndarray]:
+        """The image being edited, always C-contiguous."""
+        return self._current_image
+
+    @current_image.setter
+    def current_image(self, image: Optional[np.ndarray]):
+        # Normalise once here so cv2 never copies a strided view internally;
+        # already-contiguous arrays pass through as the same object
+        self._current_image = None if image is None else np.ascontiguousarray(image)
+
+    @property
+    def original_image(self) -> Optional[np.ndarray]:
+        """The image as loaded, re-decoded from the file bytes when those are kept."""
+        if self._encoded_bytes is not None:
+            return self.decode_image(self._encoded_bytes)
+        return self._original_image
+
+    @staticmethod
+    def decode_image(data: bytes) -> Optional[np.ndarray]:
+        """Decode encoded image file bytes into an RGB array, or None."""
+        image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            return None
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+
     def load_image(self, image_path: str) -> bool:
         """Load an image from file path."""
         try:
-            image = cv2.imread(image_path)
+            with open(image_path, 'rb') as f:
+                data = f.read()
+            image = self.decode_image(data)
             if image is None:
                 return False
-            self.original_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            self.current_image = copy.deepcopy(self.original_image)
+            self.set_image(image, data)
             self.image_path = image_path
-            self.history = []
-            self.history_index = -1
             return True
         except Exception as e:
             print(f"Error loading image: {e}")
             return False
 
-    def save_image(self, file_path: str) -> bool:
-        """Save the current image to file."""
+    def set_image(self, image: np.ndarray, encoded: Optional[bytes] = None) -> bool:
+        """Start editing an already decoded RGB image.
+
+        When the encoded file bytes are given they are kept instead of a
+        second raster, and reset decodes them again.
+        """
+        if image is None:
+            return False
+        self._encoded_bytes = encoded
+        self._original_image = None if encoded is not None else image
+        self._start_history(image)
+        return True
+
+    def save_image(self, file_path: str, image: Optional[np.ndarray] = None) -> bool:
+        """Save the current image, or a previously taken image array, to file."""
         try:
-            if self.current_image is None:
+            if image is None:
+                image = self.current_image
+            if image is None:
                 return False
-            # Convert RGB back to BGR for OpenCV
-            image_bgr = cv2.cvtColor(self.current_image, cv2.COLOR_RGB2BGR)
-            cv2.imwrite(file_path, image_bgr)
-            return True
+            if image.ndim == 3:
+                # Convert RGB back to BGR for OpenCV
+                image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+            return bool(cv2.imwrite(file_path, image))
         except Exception as e:
             print(f"Error saving image: {e}")
             return False
 
-    def _save_to_history(self):
-        """Save current state to history for undo/redo functionality."""
+    def _start_history(self, image: np.ndarray):
+        """Start a fresh history whose first state is image."""
+        # Arrays are never modified in place, so the state can be shared
+        self.current_image = image
+        self._committed_image = self.current_image
+        self._pending_op = None
+        self._result_cache.clear()
+        self.history = [{'kind': 'snapshot', 'op': 'load', 'params': (), 'state': self.current_image}]
+        self.history_index = 0
+
+    def _save_to_history(self, op_tag: str, params: tuple = (), snapshot: bool = False):
+        """Save current state to history for undo/redo functionality.
+
+        Each entry describes the state after an op. Cheap, deterministic ops
+        in REPLAY_OPS are stored as {'kind': 'op'} records and replayed from
+        the nearest earlier snapshot; everything else is a {'kind': 'snapshot'}
+        holding the image. Only the newest HISTORY_RAW_STATES snapshots stay
+        as arrays, older ones are PNG bytes (see _encode_state).
+
+        Repeated slider ops committed within COALESCE_WINDOW seconds replace
+        the last entry instead of appending a new one. snapshot forces a
+        snapshot entry even for a replayable op.
+        """
+        now = time.monotonic()
+        coalesce = (op_tag in self.COALESCE_OPS
+                    and self.history_index > 0
+                    and self.history_index == len(self.history) - 1
+                    and self.history[-1]['op'] == op_tag
+                    and now - self._last_edit_t < self.COALESCE_WINDOW)
+        self._last_edit_t = now
+
+        entry = {'kind': 'snapshot', 'op': op_tag, 'params': params, 'state': self.current_image}
+        if (not snapshot and op_tag in self.REPLAY_OPS
+                and self._ops_since_snapshot() < self.MAX_REPLAY_OPS):
+            entry = {'kind': 'op', 'op': op_tag, 'params': params}
+
+        if coalesce:
+            self.history[-1] = entry
+            return
         # Remove any redo history if we make a new edit
         self.history = self.history[:self.history_index + 1]
-        self.history.append(copy.deepcopy(self.current_image))
+        self.history.append(entry)
         self.history_index += 1
+        self._spill_old_snapshots()
+
+    def _ops_since_snapshot(self) -> int:
+        """Count op records between the history head and its last snapshot."""
+        count = 0
+        for entry in reversed(self.history[:self.history_index + 1]):
+            if entry['kind'] == 'snapshot':
+                break
+            count += 1
+        return count
+
+    def _spill_old_snapshots(self):
+        """Compress snapshots that have left the raw window."""
+        raw = 0
+        for entry in reversed(self.history):
+            if entry['kind'] != 'snapshot':
+                continue
+            raw += 1
+            if raw > self.HISTORY_RAW_STATES and isinstance(entry['state'], np.ndarray):
+                entry['state'] = self._encode_state(entry['state'])
+
+    @staticmethod
+    def _encode_state(image: np.ndarray) -> bytes:
+        """Losslessly compress an image state for long-term history storage."""
+        ok, buffer = cv2.imencode('.png', image, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+        if not ok:
+            raise ValueError("Failed to encode history state")
+        return buffer.tobytes()
+
+    @staticmethod
+    def _decode_state(state) -> np.ndarray:
+        """Return the image for a history state, decoding it if compressed."""
+        if isinstance(state, np.ndarray):
+            return state
+        return cv2.imdecode(np.frombuffer(state, np.uint8), cv2.IMREAD_UNCHANGED)
+
+    def _commit_state(self, op_tag: str, params: tuple = ()):
+        """Make the current image the new base and record it in history."""
+        # An uncommitted slider result is baked into current_image but not into
+        # any history state, so replaying op_tag from a snapshot would lose it
+        baked_in = self._pending_op is not None and self._pending_op != (op_tag, params)
+        self._committed_image = self.current_image
+        self._pending_op = None
+        self._save_to_history(op_tag, params, snapshot=baked_in)
+
+    def commit(self) -> bool:
+        """Commit the pending slider result, e.g. when a drag ends."""
+        if self.current_image is None:
+            return False
+        if self._pending_op is not None:
+            self._commit_state(*self._pending_op)
+        return True
+
+    def _state_at(self, index: int) -> np.ndarray:
+        """Rebuild the image at a history index from its nearest snapshot."""
+        start = index
+        while self.history[start]['kind'] != 'snapshot':
+            start -= 1
+        image = self._decode_state(self.history[start]['state'])
+        for entry in self.history[start + 1:index + 1]:
+            image = self._apply_op(entry['op'], entry['params'], image)
+        return image
+
+    def _restore(self, index: int):
+        """Restore the history state at index as current and committed image."""
+        self.history_index = index
+        self.current_image = self._state_at(index)
+        self._committed_image = self.current_image
+        self._pending_op = None
 
     def undo(self) -> bool:
         """Undo the last operation."""
         if self.history_index > 0:
-            self.history_index -= 1
-            self.current_image = copy.deepcopy(self.history[self.history_index])
+            self._restore(self.history_index - 1)
             return True
         return False
 
     def redo(self) -> bool:
         """Redo the last undone operation."""
         if self.history_index < len(self.history) - 1:
-            self.history_index += 1
-            self.current_image = copy.deepcopy(self.history[self.history_index])
+            self._restore(self.history_index + 1)
             return True
         return False
 
+    def _on_device(self, image: np.ndarray):
+        """Wrap image as a UMat when OpenCL is enabled so cv2 runs it on the GPU."""
+        return cv2.UMat(image) if self.use_gpu else image
+
+    @staticmethod
+    def _to_host(result) -> np.ndarray:
+        """Download a UMat result back into a NumPy array."""
+        return result.get() if isinstance(result, cv2.UMat) else result
+
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def _gaussian_kernel(ksize: int) -> np.ndarray:
+        """Return the cached 1-D Gaussian kernel for an odd size."""
+        return cv2.getGaussianKernel(ksize, 0)
+
+    @staticmethod
+    def _stack_blur_ksize(ksize: int) -> int:
+        """Return the stackBlur size whose spread matches a Gaussian of size ksize.
+
+        A stack blur of radius r has sigma ~ sqrt(r * (r + 2) / 6), so a
+        stackBlur of the same ksize blurs clearly more than the Gaussian.
+        """
+        # Sigma OpenCV derives for a Gaussian kernel of this size
+        sigma = 0.3 * ((ksize - 1) * 0.5 - 1) + 0.8
+        radius = max(1, round(np.sqrt(1 + 6 * sigma ** 2) - 1))
+        return 2 * radius + 1
+
+    def _gaussian_blur(self, image, ksize: int):
+        """Blur with a square Gaussian kernel of odd size ksize.
+
+        Large kernels use cv2.stackBlur when available (OpenCV >= 4.7), whose
+        cost does not grow with the radius; otherwise the separable filter is
+        run with cached 1-D weights.
+        """
+        if ksize >= self.STACK_BLUR_MIN_KSIZE and hasattr(cv2, 'stackBlur'):
+            return cv2.stackBlur(image, (self._stack_blur_ksize(ksize),) * 2)
+        kernel = self._gaussian_kernel(ksize)
+        return cv2.sepFilter2D(image, -1, kernel, kernel)
+
+    def _apply_op(self, op_tag: str, params: tuple, image: np.ndarray) -> np.ndarray:
+        """Apply one of the REPLAY_OPS to image and return the result."""
+        if op_tag == 'grayscale':
+            return self._to_gray(image)
+        if op_tag == 'rotate':
+            return cv2.rotate(image, self.ROTATIONS[params[0]])
+        if op_tag == 'flip':
+            return cv2.flip(image, self.FLIP_CODES[params[0].lower()])
+        if op_tag == 'resize':
+            return self._to_host(cv2.resize(self._on_device(image), params))
+        if op_tag == 'transform':
+            steps, out_size = params
+            if out_size is None:
+                # A pure rotate/flip chain is exactly one cv2.rotate plus one cv2.flip
+                angle, direction = self._reduce_steps(steps)
+                if angle is not None:
+                    image = cv2.rotate(image, self.ROTATIONS[angle])
+                if direction is not None:
+                    image = cv2.flip(image, self.FLIP_CODES[direction])
+                return image
+            matrix, size = self._transform_matrix(steps, (image.shape[1], image.shape[0]), out_size)
+            return self._to_host(cv2.warpAffine(self._on_device(image), matrix, size,
+                                                flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE))
+        raise ValueError(f"Cannot replay operation: {op_tag}")
+
+    def _cached(self, op_name: str, params: tuple, src: np.ndarray, compute) -> np.ndarray:
+        """Return compute(src), reusing a recent result for the same op, params and input.
+
+        Inputs are keyed by identity; each entry keeps a reference to its input
+        so the id cannot be recycled by a different array while it is cached.
+        """
+        key = (op_name, params, id(src))
+        hit = self._result_cache.get(key)
+        if hit is not None and hit[0] is src:
+            self._result_cache.move_to_end(key)
+            return hit[1]
+        result = compute(src)
+        self._result_cache[key] = (src, result)
+        if len(self._result_cache) > self.RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _build_bc_lut(brightness: float, contrast: float, pivot: float) -> np.ndarray:
+        """Build a 256-entry uint8 table for ((x - pivot) * contrast + pivot) * brightness.
+
+        Callers round the arguments so that slider ticks repeating a value
+        reuse the cached table. The returned array is shared; do not modify it.
+        """
+        values = np.arange(256, dtype=np.float32)
+        values = ((values - pivot) * contrast + pivot) * brightness
+        return np.clip(np.rint(values), 0, 255).astype(np.uint8)
+
+    @staticmethod
+    def _to_gray(image: np.ndarray) -> np.ndarray:
+        """Return a single-channel version of image (a no-op if already gray)."""
+        if image.ndim == 2:
+            return image
+        return cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+
     def get_image(self) -> Optional[np.ndarray]:
         """Get the current image"""
         return self.current_image
@@ -84,100 +377,216 @@ class ImageProcessor:
         """Convert image to grayscale."""
         if self.current_image is None:
             return False
-        self._save_to_history()
-        gray = cv2.cvtColor(self.current_image, cv2.COLOR_RGB2GRAY)
-        self.current_image = cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB)
+        self.current_image = self._cached(
+            'grayscale', (), self.current_image,
+            lambda src: self._apply_op('grayscale', (), src))
+        self._commit_state('grayscale')
         return True
 
     def apply_blur(self, intensity: int = 5) -> bool:
-        """Apply Gaussian blur to the image (intensity must be odd)"""
-        if self.current_image is None:
+        """Apply Gaussian blur to the committed image (intensity must be odd)"""
+        if self._committed_image is None:
             return False
-        self._save_to_history()
         # Ensure intensity is odd
         intensity = max(1, intensity if intensity % 2 == 1 else intensity + 1)
-        self.current_image = cv2.GaussianBlur(self.current_image, (intensity, intensity), 0)
+        self.current_image = self._cached(
+            'blur', (intensity,), self._committed_image,
+            lambda src: self._to_host(self._gaussian_blur(self._on_device(src), intensity)))
+        self._pending_op = ('blur', (intensity,))
         return True
 
+    def apply_blur_preview(self, intensity: int = 5, scale: float = 0.25) -> Optional[np.ndarray]:
+        """Return a blurred, downsampled copy for live preview (no history)."""
+        if self._committed_image is None:
+            return None
+        small = cv2.resize(self._on_device(self._committed_image), None, fx=scale, fy=scale,
+                           interpolation=cv2.INTER_AREA)
+        # Shrink the kernel with the image so the preview looks like the full result
+        intensity = max(1, int(intensity * scale))
+        intensity = intensity if intensity % 2 == 1 else intensity + 1
+        return self._to_host(self._gaussian_blur(small, intensity))
+
     def detect_edges(self, threshold1: int = 100, threshold2: int = 200) -> bool:
         """Apply Canny edge detection to the image."""
         if self.current_image is None:
             return False
-        self._save_to_history()
-        gray = cv2.cvtColor(self.current_image, cv2.COLOR_RGB2GRAY)
-        edges = cv2.Canny(gray, threshold1, threshold2)
-        self.current_image = cv2.cvtColor(edges, cv2.COLOR_GRAY2RGB)
+
+        def to_edges(src):
+            # The edge map stays single-channel like other gray images
+            return self._to_host(cv2.Canny(self._on_device(self._to_gray(src)), threshold1, threshold2))
+
+        self.current_image = self._cached('edges', (threshold1, threshold2), self.current_image, to_edges)
+        self._commit_state('edges', (threshold1, threshold2))
         return True
 
+    def _preview_base(self) -> np.ndarray:
+        """Return the committed image shrunk to at most PREVIEW_MAX_SIDE pixels."""
+        def shrink(src):
+            scale = self.PREVIEW_MAX_SIDE / max(src.shape[:2])
+            if scale >= 1:
+                return src
+            return self._to_host(cv2.resize(self._on_device(src), None, fx=scale, fy=scale,
+                                            interpolation=cv2.INTER_AREA))
+
+        return self._cached('preview_base', (self.PREVIEW_MAX_SIDE,), self._committed_image, shrink)
+
+    def _brightness(self, src: np.ndarray, factor: float) -> np.ndarray:
+        """Scale brightness of src by factor through a cached LUT."""
+        return cv2.LUT(src, self._build_bc_lut(factor, 1.0, 0.0))
+
+    def _contrast(self, src: np.ndarray, factor: float) -> np.ndarray:
+        """Scale contrast of src by factor through cached per-channel LUTs."""
+        # Pivot each channel around its own mean so the mean colour is
+        # preserved; a multi-channel LUT still applies this in one pass
+        channels = 1 if src.ndim == 2 else src.shape[2]
+        luts = [self._build_bc_lut(1.0, factor, round(mean, 1))
+                for mean in cv2.mean(src)[:channels]]
+        if channels == 1:
+            return cv2.LUT(src, luts[0])
+        # Stack the tables into an explicit 256x1xC LUT; cv2.merge of 1-D
+        # tables gives a different shape across OpenCV versions
+        return cv2.LUT(src, np.stack(luts, axis=-1).reshape(256, 1, channels))
+
     def adjust_brightness(self, factor: float = 1.0) -> bool:
-        """Adjust image brightness by given factor."""
-        if self.current_image is None:
+        """Adjust brightness of the committed image by given factor."""
+        if self._committed_image is None:
             return False
-        self._save_to_history()
-        hsv = cv2.cvtColor(self.current_image, cv2.COLOR_RGB2HSV).astype(np.float32)
-        hsv[:, :, 2] = hsv[:, :, 2] * factor
-        hsv[:, :, 2] = np.clip(hsv[:, :, 2], 0, 255)
-        self.current_image = cv2.cvtColor(hsv.astype(np.uint8), cv2.COLOR_HSV2RGB)
+        factor = round(factor, 3)
+        self.current_image = self._cached(
+            'brightness', (factor,), self._committed_image,
+            lambda src: self._brightness(src, factor))
+        self._pending_op = ('brightness', (factor,))
         return True
 
+    def adjust_brightness_preview(self, factor: float = 1.0) -> Optional[np.ndarray]:
+        """Return a brightness-adjusted, downsampled copy for live preview (no history)."""
+        if self._committed_image is None:
+            return None
+        factor = round(factor, 3)
+        return self._cached('brightness_preview', (factor,), self._preview_base(),
+                            lambda src: self._brightness(src, factor))
+
     def adjust_contrast(self, factor: float = 1.0) -> bool:
-        """Adjust image contrast by given factor."""
-        if self.current_image is None:
+        """Adjust contrast of the committed image by given factor."""
+        if self._committed_image is None:
             return False
-        self._save_to_history()
-        img = self.current_image.astype(np.float32)
-        mean = np.mean(img, axis=(0, 1))
-        img = (img - mean) * factor + mean
-        img = np.clip(img, 0, 255)
-        self.current_image = img.astype(np.uint8)
+        factor = round(factor, 3)
+        self.current_image = self._cached(
+            'contrast', (factor,), self._committed_image,
+            lambda src: self._contrast(src, factor))
+        self._pending_op = ('contrast', (factor,))
         return True
 
+    def adjust_contrast_preview(self, factor: float = 1.0) -> Optional[np.ndarray]:
+        """Return a contrast-adjusted, downsampled copy for live preview (no history)."""
+        if self._committed_image is None:
+            return None
+        factor = round(factor, 3)
+        return self._cached('contrast_preview', (factor,), self._preview_base(),
+                            lambda src: self._contrast(src, factor))
+
     def rotate_image(self, angle: int) -> bool:
         """Rotate image by the specified angle (90/180/270)."""
-        if self.current_image is None:
-            return False
-        self._save_to_history()
-        
-        if angle == 90:
-            self.current_image = cv2.rotate(self.current_image, cv2.ROTATE_90_COUNTERCLOCKWISE)
-        elif angle == 180:
-            self.current_image = cv2.rotate(self.current_image, cv2.ROTATE_180)
-        elif angle == 270:
-            self.current_image = cv2.rotate(self.current_image, cv2.ROTATE_90_CLOCKWISE)
-        else:
+        if self.current_image is None or angle not in self.ROTATIONS:
             return False
-        
+        self.current_image = self._apply_op('rotate', (angle,), self.current_image)
+        self._commit_state('rotate', (angle,))
         return True
 
     def flip_image(self, direction: str = 'horizontal') -> bool:
         """Flip image horizontally or vertically."""
-        if self.current_image is None:
+        if self.current_image is None or direction.lower() not in self.FLIP_CODES:
             return False
-        self._save_to_history()
-        
-        if direction.lower() == 'horizontal':
-            self.current_image = cv2.flip(self.current_image, 1)
-        elif direction.lower() == 'vertical':
-            self.current_image = cv2.flip(self.current_image, 0)
-        else:
-            return False
-        
+        self.current_image = self._apply_op('flip', (direction,), self.current_image)
+        self._commit_state('flip', (direction,))
         return True
 
     def resize_image(self, width: int, height: int) -> bool:
         """Resize the image to specified width and height."""
         if self.current_image is None:
             return False
-        self._save_to_history()
-        
-        self.current_image = cv2.resize(self.current_image, (width, height))
+        self.current_image = self._apply_op('resize', (width, height), self.current_image)
+        self._commit_state('resize', (width, height))
+        return True
+
+    @staticmethod
+    def _transform_matrix(steps, size: Tuple[int, int],
+                          out_size: Optional[Tuple[int, int]] = None) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """Compose rotate/flip steps and an optional resize into one 2x3 affine matrix.
+
+        Steps are ('rotate', 90/180/270) or ('flip', 'horizontal'/'vertical')
+        and match rotate_image/flip_image. The maths uses pixel-centre
+        coordinates (x + 0.5), so rotations and flips map pixel centres onto
+        pixel centres; the resize part is bilinear and can differ from
+        cv2.resize by a few grey levels. Returns the matrix and the output
+        (width, height).
+        """
+        w, h = size
+        m = np.eye(3)
+        for op, value in steps:
+            if op == 'rotate' and value == 90:
+                step = [[0, 1, 0], [-1, 0, w], [0, 0, 1]]
+                w, h = h, w
+            elif op == 'rotate' and value == 180:
+                step = [[-1, 0, w], [0, -1, h], [0, 0, 1]]
+            elif op == 'rotate' and value == 270:
+                step = [[0, -1, h], [1, 0, 0], [0, 0, 1]]
+                w, h = h, w
+            elif op == 'flip' and value.lower() == 'horizontal':
+                step = [[-1, 0, w], [0, 1, 0], [0, 0, 1]]
+            elif op == 'flip' and value.lower() == 'vertical':
+                step = [[1, 0, 0], [0, -1, h], [0, 0, 1]]
+            else:
+                raise ValueError(f"Unsupported transform step: {op} {value}")
+            m = np.array(step, dtype=np.float64) @ m
+        if out_size is not None:
+            m = np.diag([out_size[0] / w, out_size[1] / h, 1.0]) @ m
+            w, h = out_size
+        shift = np.array([[1, 0, 0.5], [0, 1, 0.5], [0, 0, 1]])
+        m = np.linalg.inv(shift) @ m @ shift
+        return m[:2], (w, h)
+
+    @staticmethod
+    def _reduce_steps(steps) -> Tuple[Optional[int], Optional[str]]:
+        """Reduce a rotate/flip chain to at most one rotation followed by one flip.
+
+        Returns (angle, direction), either of which may be None. The chain's
+        linear part is one of eight signed permutations, matched against the
+        candidates built by _transform_matrix itself.
+        """
+        target = ImageProcessor._transform_matrix(steps, (1, 1))[0][:, :2].round()
+        for angle in (None, 90, 180, 270):
+            for direction in (None, 'horizontal'):
+                candidate = ([('rotate', angle)] if angle is not None else []) + \
+                            ([('flip', direction)] if direction is not None else [])
+                if np.array_equal(ImageProcessor._transform_matrix(candidate, (1, 1))[0][:, :2].round(),
+                                  target):
+                    return angle, direction
+        raise ValueError(f"Cannot reduce transform steps: {steps}")
+
+    def transform_size(self, steps=()) -> Tuple[int, int]:
+        """Get the image dimensions after applying rotate/flip steps"""
+        if self.current_image is None:
+            return (0, 0)
+        return self._transform_matrix(steps, self.get_image_dimensions())[1]
+
+    def compose_transform(self, steps, out_size: Optional[Tuple[int, int]] = None) -> bool:
+        """Apply a chain of rotate/flip steps and an optional resize.
+
+        A pure chain runs as one cv2.rotate plus one cv2.flip; with out_size
+        the steps and the resize are composed into a single warpAffine pass.
+        """
+        if self.current_image is None:
+            return False
+        params = (tuple(steps), tuple(out_size) if out_size is not None else None)
+        self.current_image = self._apply_op('transform', params, self.current_image)
+        self._commit_state('transform', params)
         return True
 
     def reset_image(self) -> bool:
         """Reset image to original."""
-        if self.original_image is None:
+        image = self.original_image
+        if image is None:
             return False
-        self.current_image = copy.deepcopy(self.original_image)
-        self.history = []
-        self.history_index = -1
+        self._start_history(image)
         return True
@@ -1,11 +1,39 @@
 import tkinter as tk  
 from tkinter import filedialog, messagebox, ttk
-from PIL import Image, ImageTk
 import cv2     
+import numpy as np
 import os
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from image_processor import ImageProcessor
 from gui_controls import ControlPanel, StatusBar
 
+# Colour scheme shared by the ttk theme, the menus and the canvases
+COLORS = {name: sys.intern(value) for name, value in {
+    'bg_primary': '#1e1e2e',
+    'bg_secondary': '#2a2a3e',
+    'bg_tertiary': '#3a3a50',
+    'bg_canvas': '#0a0a0f',
+    'accent': '#00d4ff',
+    'accent_active': '#00ffff',
+    'accent_alt': '#ff006e',
+    'accent_alt_active': '#ff3366',
+    'accent_alt_pressed': '#cc0055',
+    'accent_success': '#00ff88',
+    'text_primary': '#ffffff',
+    'text_secondary': '#b0b0c0',
+    'text_dark': '#000000',
+}.items()}
+
+FONTS = {
+    'body': ('Arial', 10),
+    'bold': ('Arial', 10, 'bold'),
+    'section': ('Arial', 11, 'bold'),
+    'title': ('Arial', 12, 'bold'),
+}
+
 
 class ImageEditorGUI:
     """
@@ -25,7 +53,7 @@ class ImageEditorGUI:
         self.root.title("Image Editor Professional Image Processing Application")
         self.root.geometry("1400x900")
         
-        self.root.configure(bg='#1e1e2e')
+        self.root.configure(bg=COLORS['bg_primary'])
         
         # Setup custom style
         self.setup_style()
@@ -34,6 +62,25 @@ class ImageEditorGUI:
         self.processor = ImageProcessor()
         self.current_image_path = ""
         self.photo_image = None
+        self._last_image = None
+        self._last_key = None
+        self._pending_redraw = None
+        self._pending_args = (None, False)
+
+        # Fitting images to the canvas runs on a worker so the Tk loop stays live
+        self._req_q = queue.Queue(maxsize=1)
+        # Canvas-sized resize buffer; each frame is copied out of it into PPM
+        # bytes before leaving the worker, so one buffer is enough
+        self._scratch = None
+        self._render_seq = 0
+        self._canvas_wh = (1, 1)
+        self._worker = threading.Thread(target=self._render_worker, daemon=True)
+        self._worker.start()
+
+        # File reads and decodes run here so opening a large image doesn't freeze the UI
+        self._io_pool = ThreadPoolExecutor(max_workers=2)
+        # Decodes can finish out of order; only the newest open is applied
+        self._open_seq = 0
         
         # Create GUI components
         self.create_menu_bar()
@@ -47,51 +94,51 @@ class ImageEditorGUI:
         style = ttk.Style()
         style.theme_use('clam')
         
-        # Define color scheme
-        bg_primary = '#1e1e2e'
-        bg_secondary = '#2a2a3e'
-        bg_tertiary = '#3a3a50'
-        accent_color = '#00d4ff'
-        accent_color_alt = '#ff006e'
-        accent_color_success = '#00ff88'
-        text_primary = '#ffffff'
-        text_secondary = '#b0b0c0'
-        
+        # Colour scheme comes from the module-level COLORS
+        bg_primary = COLORS['bg_primary']
+        bg_secondary = COLORS['bg_secondary']
+        bg_tertiary = COLORS['bg_tertiary']
+        accent_color = COLORS['accent']
+        accent_color_alt = COLORS['accent_alt']
+        accent_color_success = COLORS['accent_success']
+        text_primary = COLORS['text_primary']
+        text_dark = COLORS['text_dark']
+
         # Configure TFrame
         style.configure('TFrame', background=bg_primary, foreground=text_primary)
         style.configure('Dark.TFrame', background=bg_secondary, foreground=text_primary)
         style.configure('Darker.TFrame', background=bg_tertiary, foreground=text_primary)
         
         # Configure TLabel
-        style.configure('TLabel', background=bg_primary, foreground=text_primary, font=('Arial', 10))
-        style.configure('Title.TLabel', background=bg_primary, foreground=accent_color, font=('Arial', 12, 'bold'))
-        style.configure('Section.TLabel', background=bg_secondary, foreground=accent_color, font=('Arial', 11, 'bold'))
-        style.configure('Status.TLabel', background=bg_tertiary, foreground=accent_color_success, font=('Arial', 12, 'bold'))
+        style.configure('TLabel', background=bg_primary, foreground=text_primary, font=FONTS['body'])
+        style.configure('Title.TLabel', background=bg_primary, foreground=accent_color, font=FONTS['title'])
+        style.configure('Section.TLabel', background=bg_secondary, foreground=accent_color, font=FONTS['section'])
+        style.configure('Status.TLabel', background=bg_tertiary, foreground=accent_color_success, font=FONTS['title'])
         
         # Configure TLabelFrame
-        style.configure('TLabelframe', background=bg_secondary, foreground=accent_color, font=('Arial', 10, 'bold'), borderwidth=2, relief='solid')
-        style.configure('TLabelframe.Label', background=bg_secondary, foreground=accent_color, font=('Arial', 10, 'bold'))
+        style.configure('TLabelframe', background=bg_secondary, foreground=accent_color, font=FONTS['bold'], borderwidth=2, relief='solid')
+        style.configure('TLabelframe.Label', background=bg_secondary, foreground=accent_color, font=FONTS['bold'])
         
         # Configure TButton with gradient-like effect
         style.configure('TButton', 
                        background=accent_color, 
-                       foreground='#000000',
-                       font=('Arial', 10, 'bold'),
+                       foreground=text_dark,
+                       font=FONTS['bold'],
                        borderwidth=0,
                        padding=8,
                        relief='raised')
         style.map('TButton',
-                 background=[('active', '#00ffff'), ('pressed', accent_color_alt)],
-                 foreground=[('active', '#000000'), ('pressed', text_primary)])
+                 background=[('active', COLORS['accent_active']), ('pressed', accent_color_alt)],
+                 foreground=[('active', text_dark), ('pressed', text_primary)])
         
         style.configure('Alt.TButton',
                        background=accent_color_alt,
                        foreground=text_primary,
-                       font=('Arial', 10, 'bold'),
+                       font=FONTS['bold'],
                        borderwidth=0,
                        padding=8)
         style.map('Alt.TButton',
-                 background=[('active', '#ff3366'), ('pressed', '#cc0055')],
+                 background=[('active', COLORS['accent_alt_active']), ('pressed', COLORS['accent_alt_pressed'])],
                  foreground=[('active', text_primary), ('pressed', text_primary)])
         
         # Configure TScale
@@ -102,12 +149,12 @@ class ImageEditorGUI:
 
     def create_menu_bar(self):
         """Create the menu bar with File and Edit menus."""
-        menubar = tk.Menu(self.root, bg='#2a2a3e', fg='#00d4ff', activebackground='#ff006e', activeforeground='#ffffff', font=('Arial', 10, 'bold'))
+        menubar = tk.Menu(self.root, bg=COLORS['bg_secondary'], fg=COLORS['accent'], activebackground=COLORS['accent_alt'], activeforeground=COLORS['text_primary'], font=FONTS['bold'])
         self.root.config(menu=menubar)
 
         # File menu
-        file_menu = tk.Menu(menubar, bg='#2a2a3e', fg='#ffffff', activebackground='#00d4ff', activeforeground='#000000', font=('Arial', 10))
-        menubar.add_cascade(label="File", menu=file_menu, foreground='#00d4ff')
+        file_menu = tk.Menu(menubar, bg=COLORS['bg_secondary'], fg=COLORS['text_primary'], activebackground=COLORS['accent'], activeforeground=COLORS['text_dark'], font=FONTS['body'])
+        menubar.add_cascade(label="File", menu=file_menu, foreground=COLORS['accent'])
         file_menu.add_command(label="Open", command=self.open_image, accelerator="Ctrl+O")
         file_menu.add_command(label="Save", command=self.save_image, accelerator="Ctrl+S")
         file_menu.add_command(label="Save As...", command=self.save_image_as, accelerator="Ctrl+Shift+S")
@@ -115,14 +162,14 @@ class ImageEditorGUI:
         file_menu.add_command(label="Exit", command=self.root.quit, accelerator="Alt+F4")
 
         # Edit menu
-        edit_menu = tk.Menu(menubar, bg='#2a2a3e', fg='#ffffff', activebackground='#00d4ff', activeforeground='#000000', font=('Arial', 10))
-        menubar.add_cascade(label="Edit", menu=edit_menu, foreground='#00ff88')
+        edit_menu = tk.Menu(menubar, bg=COLORS['bg_secondary'], fg=COLORS['text_primary'], activebackground=COLORS['accent'], activeforeground=COLORS['text_dark'], font=FONTS['body'])
+        menubar.add_cascade(label="Edit", menu=edit_menu, foreground=COLORS['accent_success'])
         edit_menu.add_command(label="Undo", command=self.undo, accelerator="Ctrl+Z")
         edit_menu.add_command(label="Redo", command=self.redo, accelerator="Ctrl+Y")
 
         # Help menu
-        help_menu = tk.Menu(menubar, bg='#2a2a3e', fg='#ffffff', activebackground='#00d4ff', activeforeground='#000000', font=('Arial', 10))
-        menubar.add_cascade(label="Help", menu=help_menu, foreground='#ff006e')
+        help_menu = tk.Menu(menubar, bg=COLORS['bg_secondary'], fg=COLORS['text_primary'], activebackground=COLORS['accent'], activeforeground=COLORS['text_dark'], font=FONTS['body'])
+        menubar.add_cascade(label="Help", menu=help_menu, foreground=COLORS['accent_alt'])
         help_menu.add_command(label="About", command=self.show_about)
 
         # Bind keyboard shortcuts
@@ -155,7 +202,7 @@ class ImageEditorGUI:
         scroll_frame = ttk.Frame(left_frame, style='Dark.TFrame')
         scroll_frame.pack(fill=tk.BOTH, expand=True)
 
-        canvas = tk.Canvas(scroll_frame, bg='#2a2a3e', highlightthickness=0, relief=tk.FLAT)
+        canvas = tk.Canvas(scroll_frame, bg=COLORS['bg_secondary'], highlightthickness=0, relief=tk.FLAT)
         scrollbar = ttk.Scrollbar(scroll_frame, orient="vertical", command=canvas.yview)
         scrollable_frame = ttk.Frame(canvas, style='Dark.TFrame')
 
@@ -165,7 +212,7 @@ class ImageEditorGUI:
         )
 
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set, bg='#2a2a3e')
+        canvas.configure(yscrollcommand=scrollbar.set, bg=COLORS['bg_secondary'])
 
         # Create control panel inside scrollable frame
         self.control_panel = ControlPanel(scrollable_frame, self.processor, self.update_display)
@@ -185,8 +232,13 @@ class ImageEditorGUI:
         canvas_frame = ttk.Frame(right_frame, style='Darker.TFrame')
         canvas_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        self.image_canvas = tk.Canvas(canvas_frame, bg='#0a0a0f', cursor="cross", relief=tk.SUNKEN, bd=3, highlightthickness=0)
+        self.image_canvas = tk.Canvas(canvas_frame, bg=COLORS['bg_canvas'], cursor="cross", relief=tk.SUNKEN, bd=3, highlightthickness=0)
         self.image_canvas.pack(fill=tk.BOTH, expand=True)
+        self.image_canvas.bind("<Configure>", self._on_canvas_configure)
+        # Single Tk photo and image item, updated in place for every displayed frame
+        self.photo_image = tk.PhotoImage()
+        self._canvas_img_id = self.image_canvas.create_image(0, 0, anchor='center',
+                                                             image=self.photo_image)
 
         # Status bar at bottom
         self.status_bar = StatusBar(self.root)
@@ -208,14 +260,67 @@ class ImageEditorGUI:
                     messagebox.showerror("Error", "File does not exist.")
                     return
                 
-                if self.processor.load_image(file_path):
-                    self.current_image_path = file_path
-                    self.update_display()
-                    self.status_bar.set_status(f"Loaded: {os.path.basename(file_path)}")
-                else:
-                    messagebox.showerror("Error", "Failed to load image. Unsupported format or corrupted file.")
+                self.status_bar.set_status(f"Loading: {os.path.basename(file_path)}...")
+                self._open_seq += 1
+                seq = self._open_seq
+                future = self._io_pool.submit(self._decode_file, file_path)
+                future.add_done_callback(
+                    lambda f: self.root.after(0, self._apply_loaded, f, file_path, seq))
+        except Exception as e:
+            messagebox.showerror("Error", f"Error opening image: {str(e)}")
+
+    @staticmethod
+    def _decode_file(file_path):
+        """Read and decode an image file off the Tk thread.
+
+        Returns the RGB array (None if it could not be decoded) and the file bytes.
+        """
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        return ImageProcessor.decode_image(data), data
+
+    def _apply_loaded(self, future, file_path, seq):
+        """Queue a decoded image for the processor and show it (Tk thread only).
+
+        Results from an open that a later one has superseded are ignored.
+        """
+        if seq != self._open_seq:
+            return
+        try:
+            image, data = future.result()
         except Exception as e:
             messagebox.showerror("Error", f"Error opening image: {str(e)}")
+            return
+
+        def loaded(result):
+            self.current_image_path = file_path
+            self.update_display()
+            self.status_bar.set_status(f"Loaded: {os.path.basename(file_path)}")
+            self._collect_garbage()
+
+        def failed():
+            self.status_bar.set_status("Ready - Open an image to start editing")
+            messagebox.showerror("Error", "Failed to load image. Unsupported format or corrupted file.")
+
+        # Clicks meant for the old image must not rotate the new one
+        self.control_panel.discard_transforms()
+        # Runs after any edit still in flight, so no job from the old image lands on it
+        self.control_panel.submit(self._set_loaded, (image, data, file_path),
+                                  "Failed to load image", "Error opening image",
+                                  on_success=loaded, on_failure=failed)
+
+    def _set_loaded(self, image, data, file_path):
+        """Edit worker job: make a decoded image the one being edited."""
+        if not self.processor.set_image(image, data):
+            return False
+        self.processor.image_path = file_path
+        return True
+
+    @staticmethod
+    def _collect_garbage():
+        """Free memory dropped by the previous image at a session boundary."""
+        import gc
+        gc.collect()
 
     def save_image(self):
         """Save the current image."""
@@ -227,11 +332,8 @@ class ImageEditorGUI:
             self.save_image_as()
         else:
             try:
-                if self.processor.save_image(self.current_image_path):
-                    messagebox.showinfo("Success", "Image saved successfully")
-                    self.status_bar.set_status(f"Saved: {os.path.basename(self.current_image_path)}")
-                else:
-                    messagebox.showerror("Error", "Failed to save image. Check file permissions.")
+                self._start_save(self.current_image_path,
+                                 "Failed to save image. Check file permissions.")
             except Exception as e:
                 messagebox.showerror("Error", f"Error saving image: {str(e)}")
 
@@ -254,85 +356,227 @@ class ImageEditorGUI:
             )
 
             if file_path:
-                if self.processor.save_image(file_path):
-                    self.current_image_path = file_path
-                    messagebox.showinfo("Success", "Image saved successfully")
-                    self.status_bar.set_status(f"Saved: {os.path.basename(file_path)}")
-                else:
-                    messagebox.showerror("Error", "Failed to save image. Check file permissions or disk space.")
+                self._start_save(file_path,
+                                 "Failed to save image. Check file permissions or disk space.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error saving image: {str(e)}")
+
+    def _start_save(self, file_path, failure):
+        """Encode and write the current image on the I/O pool.
+
+        The image array is taken on the edit worker once earlier edits have
+        finished, so later edits don't leak into the file. failure is the
+        message shown if the write fails.
+        """
+        def write(snapshot):
+            future = self._io_pool.submit(self._do_save, file_path, snapshot)
+            future.add_done_callback(
+                lambda f: self.root.after(0, self._after_save, f, file_path, failure))
+
+        self.status_bar.set_status(f"Saving: {os.path.basename(file_path)}...")
+        self.control_panel.submit(self.processor.get_image, (), failure, "Error saving image",
+                                  on_success=write)
+
+    def _do_save(self, file_path, image):
+        """Write image to file_path off the Tk thread."""
+        return self.processor.save_image(file_path, image)
+
+    def _after_save(self, future, file_path, failure):
+        """Report the result of a background save (Tk thread only)."""
+        try:
+            if future.result():
+                self.current_image_path = file_path
+                self._collect_garbage()
+                self.status_bar.set_status(f"Saved: {os.path.basename(file_path)}")
+                messagebox.showinfo("Success", "Image saved successfully")
+            else:
+                self.status_bar.set_status("Save failed")
+                messagebox.showerror("Error", failure)
         except Exception as e:
             messagebox.showerror("Error", f"Error saving image: {str(e)}")
 
     def undo(self):
         """Undo last operation."""
+        def undone(result):
+            self.update_display()
+            self.status_bar.set_status("Undo completed")
+
         try:
-            if self.processor.undo():
-                self.update_display()
-                self.status_bar.set_status("Undo completed")
-            else:
-                messagebox.showinfo("Info", "No more operations to undo")
+            # Queued behind any edit still running so it undoes that edit
+            self.control_panel.submit(self.processor.undo, (), "Failed to undo", "Error during undo",
+                                      on_success=undone,
+                                      on_failure=lambda: messagebox.showinfo("Info", "No more operations to undo"))
         except Exception as e:
             messagebox.showerror("Error", f"Error during undo: {str(e)}")
 
     def redo(self):
         """Redo last undone operation."""
+        def redone(result):
+            self.update_display()
+            self.status_bar.set_status("Redo completed")
+
         try:
-            if self.processor.redo():
-                self.update_display()
-                self.status_bar.set_status("Redo completed")
-            else:
-                messagebox.showinfo("Info", "No more operations to redo")
+            self.control_panel.submit(self.processor.redo, (), "Failed to redo", "Error during redo",
+                                      on_success=redone,
+                                      on_failure=lambda: messagebox.showinfo("Info", "No more operations to redo"))
         except Exception as e:
             messagebox.showerror("Error", f"Error during redo: {str(e)}")
 
-    def update_display(self):
-        """Update the image display on canvas."""
+    def update_display(self, image=None, interactive=False):
+        """Schedule a display update, optionally with a preview image.
+
+        Calls arriving within one frame (16 ms) are coalesced into a single
+        redraw of the latest request. interactive marks redraws during a
+        slider drag, which are drawn as nearest-neighbour drafts; the final
+        redraw on release uses INTER_AREA or LANCZOS. The status bar is
+        updated immediately so callers can still override it afterwards.
+        """
         try:
-            image = self.processor.get_image()
-            
-            if image is None:
+            if self.processor.get_image() is None:
                 self.status_bar.set_status("No image loaded")
                 return
 
-            # Convert to PIL Image
-            pil_image = Image.fromarray(image)
-            
-            # Scale image to fit canvas
-            canvas_width = self.image_canvas.winfo_width()
-            canvas_height = self.image_canvas.winfo_height()
+            # Update status bar
+            width, height = self.processor.get_image_dimensions()
+            filename = os.path.basename(self.current_image_path) if self.current_image_path else "Unnamed"
+            self.status_bar.update_status(filename, width, height)
+
+            self._pending_args = (image, interactive)
+            if self._pending_redraw is not None:
+                self.root.after_cancel(self._pending_redraw)
+            self._pending_redraw = self.root.after(16, self._do_update_display)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error displaying image: {str(e)}")
+
+    def _do_update_display(self):
+        """Send the latest scheduled display update to the render worker."""
+        self._pending_redraw = None
+        image, interactive = self._pending_args
+        try:
+            if image is None:
+                image = self.processor.get_image()
+            if image is None:
+                return
+
+            # Scale image to fit canvas, using the size cached on <Configure>
+            canvas_width, canvas_height = self._canvas_wh
 
             if canvas_width <= 1:
                 canvas_width = 800
             if canvas_height <= 1:
                 canvas_height = 600
 
-            # Maintain aspect ratio
-            img_width, img_height = pil_image.size
-            scale = min(canvas_width / img_width, canvas_height / img_height)
-            new_width = int(img_width * scale)
-            new_height = int(img_height * scale)
+            # Frames from older requests that finish later are not shown
+            self._render_seq += 1
 
-            if scale < 1:
-                pil_image = pil_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            # Only resample again when the image, canvas size or quality changed
+            key = (canvas_width, canvas_height, interactive)
+            if image is self._last_image and key == self._last_key:
+                # That exact frame is already on the canvas
+                return
 
-            # Convert to PhotoImage
-            self.photo_image = ImageTk.PhotoImage(pil_image)
+            # Keep only the newest request; the worker drops anything older
+            request = (image, self.processor.get_image_dimensions(), key, self._render_seq)
+            try:
+                self._req_q.get_nowait()
+            except queue.Empty:
+                pass
+            self._req_q.put_nowait(request)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error displaying image: {str(e)}")
 
-            # Update canvas
-            self.image_canvas.delete("all")
-            self.image_canvas.create_image(
-                canvas_width // 2,
-                canvas_height // 2,
-                image=self.photo_image
-            )
+    def _on_canvas_configure(self, event):
+        """Cache the canvas size and grow the display scratch buffer to fit it."""
+        self._canvas_wh = (max(1, event.width), max(1, event.height))
+        size = event.width * event.height * 3
+        if self._scratch is None or self._scratch.size < size:
+            # A frame still being written keeps its reference to the old buffer
+            self._scratch = np.empty(size, np.uint8)
+
+    def _render_worker(self):
+        """Background loop that fits requested images to the canvas."""
+        while True:
+            image, dims, key, seq = self._req_q.get()
+            try:
+                frame = self._fit_to_canvas(image, dims, key[0], key[1], key[2], self._scratch,
+                                            self.processor.use_gpu)
+                callback = (self._apply_photo, image, key, frame, seq)
+            except Exception as e:
+                callback = (lambda err=e: messagebox.showerror(
+                    "Error", f"Error displaying image: {str(err)}"),)
+            try:
+                self.root.after(0, *callback)
+            except RuntimeError:
+                # The Tk interpreter has gone away; stop rendering
+                return
 
-            # Update status bar
-            width, height = self.processor.get_image_dimensions()
-            filename = os.path.basename(self.current_image_path) if self.current_image_path else "Unnamed"
-            self.status_bar.update_status(filename, width, height)
+    def _apply_photo(self, image, key, frame, seq=None):
+        """Show a fitted PPM/PGM frame on the canvas (Tk thread only).
+
+        seq is set for frames coming from the render worker.
+        """
+        try:
+            if seq is not None and seq != self._render_seq:
+                return
+            self._last_image, self._last_key = image, key
+            canvas_width, canvas_height = key[0], key[1]
+
+            # Tk decodes the PPM straight into its own photo; the photo resizes to fit
+            self.photo_image.configure(data=frame)
+
+            # Move the persistent canvas image item and flush the redraw once
+            self.image_canvas.coords(self._canvas_img_id, canvas_width // 2, canvas_height // 2)
+            self.image_canvas.update_idletasks()
         except Exception as e:
             messagebox.showerror("Error", f"Error displaying image: {str(e)}")
 
+    @staticmethod
+    def _fit_to_canvas(image, dims, canvas_width, canvas_height, interactive, scratch=None,
+                       use_gpu=False):
+        """Return image as PPM bytes (PGM when grayscale) scaled to fit the canvas.
+
+        dims is the (width, height) of the full-resolution image, which a
+        downsampled preview is stretched back to. When resizing, the pixels are
+        written into the flat uint8 scratch buffer if it is large enough. With
+        use_gpu the resize runs on the OpenCL device instead and the frame is
+        downloaded once. Safe to call off the Tk thread.
+        """
+        # Maintain aspect ratio of the full-resolution image
+        img_width, img_height = dims
+        scale = min(canvas_width / img_width, canvas_height / img_height)
+        if scale < 1:
+            target = (int(img_width * scale), int(img_height * scale))
+        else:
+            target = (img_width, img_height)
+
+        # Resize in NumPy space with OpenCV; a downsampled preview is
+        # stretched back up to the full image size
+        if (image.shape[1], image.shape[0]) != target:
+            if interactive:
+                # Draft frame while dragging; the release redraw restores quality
+                interpolation = cv2.INTER_NEAREST
+            elif target[0] < image.shape[1]:
+                interpolation = cv2.INTER_AREA
+            else:
+                interpolation = cv2.INTER_LANCZOS4
+            shape = (target[1], target[0]) + image.shape[2:]
+            count = int(np.prod(shape))
+            if use_gpu:
+                image = cv2.resize(cv2.UMat(image), target, interpolation=interpolation).get()
+            elif scratch is not None and scratch.size >= count:
+                # Resize into warm, already faulted-in pages instead of a new array
+                image = cv2.resize(image, target, dst=scratch[:count].reshape(shape),
+                                   interpolation=interpolation)
+            else:
+                image = cv2.resize(image, target, interpolation=interpolation)
+
+        # Tk reads binary PPM natively, so no PIL bridge is needed. Joining the
+        # header with the array's buffer copies the pixels once, not twice
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        magic = b'P5' if image.ndim == 2 else b'P6'
+        header = b'%s\n%d %d\n255\n' % (magic, target[0], target[1])
+        return b''.join((header, image.data))
+
     def show_about(self):
         """Show about dialog."""
         messagebox.showinfo(